@@ -2,13 +2,68 @@
 Extract main content from article URLs.
 
 Uses trafilatura with fallback to newspaper3k for content extraction.
+Fetching is available both synchronously (requests) and asynchronously
+(aiohttp) so a batch of articles can be downloaded concurrently.
 """
 
+import asyncio
+import hashlib
+import os
+import aiohttp
 import requests
 import sys
+from urllib.parse import urlparse
 from typing import Optional
 from dataclasses import dataclass
 
+# On-disk cache of fetched HTML so re-runs (and popular URLs that reappear
+# across days) skip the network entirely
+try:
+    import diskcache
+    _CACHE = diskcache.Cache("./.hn_cache")
+except ImportError:
+    _CACHE = None  # caching is optional; fall back to fetching every time
+
+CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+# Import the extractors once at module load instead of on every call;
+# newspaper3k in particular triggers heavy package initialization
+try:
+    from resiliparse.extract.html2text import extract_plain_text
+    _HAS_RESILIPARSE = True
+except ImportError:
+    _HAS_RESILIPARSE = False
+
+try:
+    import trafilatura
+    _HAS_TRAFILATURA = True
+except ImportError:
+    _HAS_TRAFILATURA = False
+
+try:
+    from newspaper import Article
+    _HAS_NEWSPAPER = True
+except ImportError:
+    _HAS_NEWSPAPER = False
+
+
+def _cache_key(url: str) -> str:
+    """Stable cache key for a URL."""
+    return hashlib.sha256(url.encode()).hexdigest()
+
+
+def cache_get(url: str) -> Optional[str]:
+    """Return cached HTML for a URL, or None on miss."""
+    if _CACHE is None:
+        return None
+    return _CACHE.get(_cache_key(url))
+
+
+def cache_set(url: str, html: str) -> None:
+    """Store fetched HTML for a URL with a TTL."""
+    if _CACHE is not None:
+        _CACHE.set(_cache_key(url), html, expire=CACHE_TTL_SECONDS)
+
 
 @dataclass
 class ExtractedContent:
@@ -19,13 +74,53 @@ class ExtractedContent:
     url: str
     success: bool = True
     error: Optional[str] = None
+    is_html: bool = False  # True when content is HTML rather than plain text
+
+
+def build_headers(url: str) -> dict:
+    """Build request headers that work with most sites."""
+    # Extract domain for Referer header
+    parsed = urlparse(url)
+    referer = f"{parsed.scheme}://{parsed.netloc}/"
+
+    # Don't specify Accept-Encoding (let the HTTP client handle it automatically)
+    return {
+        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "en-US,en;q=0.9",
+        "Referer": referer,
+    }
+
+
+def extract_with_resiliparse(url: str, html: str) -> Optional[ExtractedContent]:
+    """Try to extract content using resiliparse (fastest extractor, ~8x trafilatura)."""
+    if not _HAS_RESILIPARSE:
+        return None
+
+    try:
+        text = extract_plain_text(
+            html,
+            main_content=True,
+            preserve_formatting=True,
+        )
+
+        if text and text.strip():
+            # resiliparse does no metadata extraction; the HN post supplies
+            # title and author downstream
+            return ExtractedContent(title="", author="", content=text, url=url)
+    except Exception as e:
+        print(f"resiliparse extraction failed: {e}")
+
+    return None
 
 
 def extract_with_trafilatura(url: str, html: str) -> Optional[ExtractedContent]:
     """Try to extract content using trafilatura."""
+    if not _HAS_TRAFILATURA:
+        print("trafilatura not installed, skipping...")
+        return None
+
     try:
-        import trafilatura
-        
         # Use HTML output to preserve headings (h2, h3, etc.)
         result = trafilatura.extract(
             html,
@@ -40,9 +135,8 @@ def extract_with_trafilatura(url: str, html: str) -> Optional[ExtractedContent]:
             title = metadata.title if metadata and metadata.title else ""
             author = metadata.author if metadata and metadata.author else ""
             
-            return ExtractedContent(title=title, author=author, content=result, url=url)
-    except ImportError:
-        print("trafilatura not installed, skipping...")
+            return ExtractedContent(title=title, author=author, content=result,
+                                    url=url, is_html=True)
     except Exception as e:
         print(f"trafilatura extraction failed: {e}")
     
@@ -51,9 +145,11 @@ def extract_with_trafilatura(url: str, html: str) -> Optional[ExtractedContent]:
 
 def extract_with_newspaper(url: str, html: str) -> Optional[ExtractedContent]:
     """Try to extract content using newspaper3k."""
+    if not _HAS_NEWSPAPER:
+        print("newspaper3k not installed, skipping...")
+        return None
+
     try:
-        from newspaper import Article
-        
         article = Article(url)
         article.download(input_html=html)
         article.parse()
@@ -65,64 +161,198 @@ def extract_with_newspaper(url: str, html: str) -> Optional[ExtractedContent]:
                 content=article.text,
                 url=url,
             )
-    except ImportError:
-        print("newspaper3k not installed, skipping...")
     except Exception as e:
         print(f"newspaper extraction failed: {e}")
     
     return None
 
 
-def extract_content(url: str, timeout: int = 15) -> ExtractedContent:
+# Extraction cascade, configurable via env; parsed once at import.
+# Trafilatura stays first: it is the only extractor that preserves
+# headings (HTML output) and article metadata. It is skipped for pages
+# above the size limit, where its lxml parsing can take seconds, so
+# resiliparse's speed is applied exactly where it matters
+_EXTRACTORS = {
+    "resiliparse": extract_with_resiliparse,
+    "trafilatura": extract_with_trafilatura,
+    "newspaper": extract_with_newspaper,
+}
+_DEFAULT_EXTRACTOR_CHAIN = "trafilatura,resiliparse,newspaper"
+
+
+def _parse_extractor_chain(value: str) -> list[str]:
+    """Parse an extractor chain spec, warning about unknown names."""
+    chain = []
+    for name in value.split(","):
+        name = name.strip()
+        if not name:
+            continue
+        if name not in _EXTRACTORS:
+            print(f"Ignoring unknown extractor in EXTRACTOR_CHAIN: {name}")
+            continue
+        chain.append(name)
+
+    if not chain:
+        print(f"EXTRACTOR_CHAIN has no valid extractors, "
+              f"using default: {_DEFAULT_EXTRACTOR_CHAIN}")
+        chain = _DEFAULT_EXTRACTOR_CHAIN.split(",")
+
+    return chain
+
+
+_EXTRACTOR_CHAIN = _parse_extractor_chain(
+    os.getenv("EXTRACTOR_CHAIN", _DEFAULT_EXTRACTOR_CHAIN))
+TRAFILATURA_MAX_BYTES = int(os.getenv("TRAFILATURA_MAX_BYTES", 2_000_000))
+
+# Give up on bodies beyond this size instead of buffering them fully
+MAX_FETCH_BYTES = int(os.getenv("MAX_FETCH_BYTES", 10_000_000))
+
+# Content types worth extracting from (PDF, video etc. are skipped unread)
+_HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+
+
+class FetchError(Exception):
+    """Raised when a response is unusable (wrong type or too large)."""
+
+
+def _check_response_headers(content_type: str, content_length: Optional[str]) -> None:
+    """Reject non-HTML or oversized responses before reading the body."""
+    # Content-Type values are case-insensitive
+    if content_type and not content_type.lower().startswith(_HTML_CONTENT_TYPES):
+        raise FetchError(f"Skipping non-HTML content type: {content_type}")
+    if content_length:
+        try:
+            length = int(content_length)
+        except ValueError:
+            return  # malformed header; the capped body read still protects us
+        if length > MAX_FETCH_BYTES:
+            raise FetchError(f"Response too large: {content_length} bytes")
+
+
+def parse_html(url: str, html: str) -> ExtractedContent:
     """
-    Extract main content from an article URL.
-    
+    Run the extraction cascade on already-downloaded HTML.
+
     Args:
+        url: The URL the HTML was fetched from
+        html: The raw HTML to extract content from
+
+    Returns:
+        ExtractedContent with the extracted data or error information
+    """
+    for name in _EXTRACTOR_CHAIN:
+        if name == "trafilatura" and len(html) > TRAFILATURA_MAX_BYTES:
+            print(f"Skipping trafilatura for oversized page ({len(html)} bytes)")
+            continue
+
+        result = _EXTRACTORS[name](url, html)
+        if result and result.content:
+            return result
+
+    # All extractors failed
+    return ExtractedContent(
+        title="", author="",
+        content="[Content could not be extracted from this page]",
+        url=url, success=False, error="All extraction methods failed",
+    )
+
+
+async def fetch_html(session: aiohttp.ClientSession, url: str,
+                     connect_timeout: int = 5, read_timeout: int = 15) -> str:
+    """Fetch a URL asynchronously and return the response body as text."""
+    cached = cache_get(url)
+    if cached is not None:
+        return cached
+
+    async with session.get(
+        url,
+        headers=build_headers(url),
+        timeout=aiohttp.ClientTimeout(connect=connect_timeout, total=read_timeout),
+        allow_redirects=True,
+    ) as response:
+        response.raise_for_status()
+        _check_response_headers(response.headers.get("Content-Type", ""),
+                                response.headers.get("Content-Length"))
+
+        # Accumulate chunks up to the cap; StreamReader.read(n) would return
+        # after the first buffered chunk, truncating the body
+        chunks = []
+        total = 0
+        async for chunk in response.content.iter_chunked(65536):
+            total += len(chunk)
+            if total > MAX_FETCH_BYTES:
+                raise FetchError(f"Response exceeded {MAX_FETCH_BYTES} bytes")
+            chunks.append(chunk)
+        html = b"".join(chunks).decode(response.charset or "utf-8",
+                                       errors="replace")
+
+    cache_set(url, html)
+    return html
+
+
+async def fetch_and_extract(session: aiohttp.ClientSession, url: str,
+                            connect_timeout: int = 5,
+                            read_timeout: int = 15) -> ExtractedContent:
+    """
+    Fetch an article URL asynchronously and extract its main content.
+
+    Args:
+        session: Shared aiohttp session (connection pooling)
         url: The URL to extract content from
-        timeout: Request timeout in seconds
-        
+        connect_timeout: Seconds allowed for establishing the connection
+        read_timeout: Seconds allowed for the whole request
+
     Returns:
         ExtractedContent with the extracted data or error information
     """
     try:
-        # Extract domain for Referer header
-        from urllib.parse import urlparse
-        parsed = urlparse(url)
-        referer = f"{parsed.scheme}://{parsed.netloc}/"
-        
-        # Simple headers that work with most sites
-        # Don't specify Accept-Encoding (let requests handle it automatically)
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.9",
-            "Referer": referer,
-        }
-        response = requests.get(url, headers=headers, timeout=timeout, allow_redirects=True)
-        response.raise_for_status()
-        html = response.text
-    except requests.RequestException as e:
+        html = await fetch_html(session, url, connect_timeout=connect_timeout,
+                                read_timeout=read_timeout)
+    except (aiohttp.ClientError, asyncio.TimeoutError, FetchError) as e:
         return ExtractedContent(
             title="", author="", content="", url=url,
             success=False, error=f"Failed to fetch URL: {e}",
         )
-    
-    # Try trafilatura first
-    result = extract_with_trafilatura(url, html)
-    if result and result.content:
-        return result
-    
-    # Fall back to newspaper3k
-    result = extract_with_newspaper(url, html)
-    if result and result.content:
-        return result
-    
-    # Both extractors failed
-    return ExtractedContent(
-        title="", author="",
-        content="[Content could not be extracted from this page]",
-        url=url, success=False, error="All extraction methods failed",
-    )
+
+    return parse_html(url, html)
+
+
+def extract_content(url: str, connect_timeout: int = 5,
+                    read_timeout: int = 15) -> ExtractedContent:
+    """
+    Extract main content from an article URL (synchronous, single URL).
+
+    Args:
+        url: The URL to extract content from
+        connect_timeout: Seconds allowed for establishing the connection
+        read_timeout: Seconds allowed for reading the response
+
+    Returns:
+        ExtractedContent with the extracted data or error information
+    """
+    html = cache_get(url)
+    if html is None:
+        try:
+            with requests.get(url, headers=build_headers(url),
+                              timeout=(connect_timeout, read_timeout),
+                              allow_redirects=True, stream=True) as response:
+                response.raise_for_status()
+                _check_response_headers(response.headers.get("Content-Type", ""),
+                                        response.headers.get("Content-Length"))
+
+                # Read at most the cap; anything larger is abandoned mid-stream
+                raw = response.raw.read(MAX_FETCH_BYTES + 1, decode_content=True)
+                if len(raw) > MAX_FETCH_BYTES:
+                    raise FetchError(f"Response exceeded {MAX_FETCH_BYTES} bytes")
+                html = raw.decode(response.encoding or "utf-8", errors="replace")
+        except (requests.RequestException, FetchError) as e:
+            return ExtractedContent(
+                title="", author="", content="", url=url,
+                success=False, error=f"Failed to fetch URL: {e}",
+            )
+        cache_set(url, html)
+
+    return parse_html(url, html)
 
 
 if __name__ == "__main__":
@@ -2,16 +2,17 @@
 Convert extracted content to EPUB format.
 """
 
+import copy
+import re
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional
 from ebooklib import epub
+from lxml import etree
+from lxml import html as lxml_html
 
 
-def escape_html(text: str) -> str:
-    """Escape HTML special characters."""
-    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-
-
+@lru_cache(maxsize=None)
 def create_navigation_html(prev_id: Optional[str], next_id: Optional[str]) -> str:
     """Create navigation links for a chapter."""
     links = []
@@ -24,66 +25,105 @@ def create_navigation_html(prev_id: Optional[str], next_id: Optional[str]) -> st
     return f'<div style="margin: 20px 0; padding: 10px; border-top: 1px solid #ccc;">{" | ".join(links)}</div>'
 
 
+_PARAGRAPH_SPLIT = re.compile(r'\n\n+')
+
+# Shared stylesheet, written once into style/main.css instead of being
+# repeated inline in every chapter
+CHAPTER_CSS = '''body { font-family: Georgia, serif; line-height: 1.6; padding: 1em; }
+h1.chapter-title { font-size: 1.8em; font-weight: bold; margin-top: 1em; margin-bottom: 0.5em; color: #333; }
+h2 { font-size: 1.4em; font-weight: bold; margin-top: 1.5em; margin-bottom: 0.5em; color: #444; }
+h3 { font-size: 1.2em; font-weight: bold; margin-top: 1.2em; margin-bottom: 0.4em; color: #555; }
+.meta { color: #666; font-size: 0.9em; margin-bottom: 1.5em; border-bottom: 1px solid #eee; padding-bottom: 1em; }
+.content { text-align: justify; }
+a { color: #0066cc; }
+'''
+
+def _parse_fragment(markup: str) -> etree._Element:
+    """Parse an HTML/XML fragment into an element, recovering if malformed."""
+    try:
+        return etree.fromstring(markup)
+    except etree.XMLSyntaxError:
+        # Not well-formed XML (messy extractor output); the HTML parser recovers
+        return lxml_html.fromstring(markup)
+
+
+def _append_markup(parent: etree._Element, markup: str) -> None:
+    """Append an HTML fragment's content to a parent element."""
+    wrapper = _parse_fragment(f"<div>{markup}</div>")
+    parent.text = wrapper.text
+    for child in wrapper:
+        parent.append(child)
+
+
 def create_chapter_html(title: str, author: str, url: str, content: str,
-                        prev_id: Optional[str] = None, next_id: Optional[str] = None) -> str:
-    """Create HTML content for a chapter."""
-    escaped_title = escape_html(title)
-    escaped_author = escape_html(author)
-    display_url = escape_html(url[:50] + '...' if len(url) > 50 else url)
-    
+                        prev_id: Optional[str] = None, next_id: Optional[str] = None,
+                        is_html: Optional[bool] = None) -> bytes:
+    """Create XHTML content for a chapter as UTF-8 bytes."""
+    display_url = url[:50] + '...' if len(url) > 50 else url
+
+    # Build the tree directly; the serializer escapes text nodes, so no
+    # manual escaping, and ebooklib gets well-formed markup to repackage
+    root = etree.Element("html")
+    head = etree.SubElement(root, "head")
+    etree.SubElement(head, "title").text = title
+    etree.SubElement(head, "link", rel="stylesheet", type="text/css",
+                     href="style/main.css")
+    body = etree.SubElement(root, "body")
+
+    # Top and bottom navigation are identical; parse once and deep-copy
+    nav_top = _parse_fragment(create_navigation_html(prev_id, next_id))
+    nav_bottom = copy.deepcopy(nav_top)
+    body.append(nav_top)
+
+    h1 = etree.SubElement(body, "h1", attrib={"class": "chapter-title"})
+    h1.text = title
+
+    meta = etree.SubElement(body, "div", attrib={"class": "meta"})
+    etree.SubElement(meta, "p").text = f"By: {author}"
+    source_p = etree.SubElement(meta, "p")
+    source_p.text = "Source: "
+    link = etree.SubElement(source_p, "a", href=url)
+    link.text = display_url
+
+    content_div = etree.SubElement(body, "div", attrib={"class": "content"})
+
     # Content is already HTML from trafilatura (preserves headings like h2, h3)
-    # If it's plain text (fallback), wrap in paragraphs
-    if '<' in content and '>' in content:
-        content_html = content  # Already HTML
+    # If it's plain text (fallback), wrap in paragraphs. The extractor tells
+    # us which via is_html; fall back to scanning for callers that don't
+    if is_html is None:
+        is_html = '<' in content and '>' in content
+
+    if is_html:
+        _append_markup(content_div, content)
     else:
-        content_html = escape_html(content)
-        content_html = content_html.replace('\n\n', '</p><p>').replace('\n', '<br/>')
-        content_html = f'<p>{content_html}</p>'
-    
-    nav_top = create_navigation_html(prev_id, next_id)
-    nav_bottom = create_navigation_html(prev_id, next_id)
-    
-    return f'''<html xmlns="http://www.w3.org/1999/xhtml">
-<head>
-    <title>{escaped_title}</title>
-    <style type="text/css">
-        body {{ font-family: Georgia, serif; line-height: 1.6; padding: 1em; }}
-        h1.chapter-title {{ font-size: 1.8em; font-weight: bold; margin-top: 1em; margin-bottom: 0.5em; color: #333; }}
-        h2 {{ font-size: 1.4em; font-weight: bold; margin-top: 1.5em; margin-bottom: 0.5em; color: #444; }}
-        h3 {{ font-size: 1.2em; font-weight: bold; margin-top: 1.2em; margin-bottom: 0.4em; color: #555; }}
-        .meta {{ color: #666; font-size: 0.9em; margin-bottom: 1.5em; border-bottom: 1px solid #eee; padding-bottom: 1em; }}
-        .content {{ text-align: justify; }}
-        a {{ color: #0066cc; }}
-    </style>
-</head>
-<body>
-    {nav_top}
-    <h1 class="chapter-title">{escaped_title}</h1>
-    <div class="meta">
-        <p>By: {escaped_author}</p>
-        <p>Source: <a href="{url}">{display_url}</a></p>
-    </div>
-    <div class="content">
-        {content_html}
-    </div>
-    {nav_bottom}
-</body>
-</html>'''
-
-
-def create_epub(posts: list[dict], output_path: str, title: Optional[str] = None) -> str:
+        for paragraph in _PARAGRAPH_SPLIT.split(content):
+            p = etree.SubElement(content_div, "p")
+            lines = paragraph.split('\n')
+            p.text = lines[0]
+            for line in lines[1:]:
+                br = etree.SubElement(p, "br")
+                br.tail = line
+
+    body.append(nav_bottom)
+
+    return etree.tostring(root, method="xml", encoding="utf-8")
+
+
+def create_epub(posts: list[dict], output_path: str, title: Optional[str] = None,
+                date: Optional[str] = None) -> str:
     """
     Create an EPUB file from a list of posts.
-    
+
     Args:
         posts: List of dicts with keys: title, author, url, content
         output_path: Path to save the EPUB file
         title: Optional title for the EPUB
-        
+        date: Date (YYYY-MM-DD) for the title/identifier; defaults to today
+
     Returns:
         Path to the created EPUB file
     """
-    today = datetime.now().strftime("%Y-%m-%d")
+    today = date or datetime.now().strftime("%Y-%m-%d")
     book_title = title or f"HN Daily - {today}"
     
     book = epub.EpubBook()
@@ -94,7 +134,7 @@ def create_epub(posts: list[dict], output_path: str, title: Optional[str] = None
     
     css = epub.EpubItem(
         uid="style", file_name="style/main.css", media_type="text/css",
-        content="body { font-family: Georgia, serif; line-height: 1.6; }"
+        content=CHAPTER_CSS
     )
     book.add_item(css)
     
@@ -110,6 +150,7 @@ def create_epub(posts: list[dict], output_path: str, title: Optional[str] = None
             lang="en"
         )
         
+        # create_chapter_html already returns UTF-8 bytes
         chapter.content = create_chapter_html(
             title=post.get("title", f"Post {i+1}"),
             author=post.get("author", "Unknown"),
@@ -117,9 +158,11 @@ def create_epub(posts: list[dict], output_path: str, title: Optional[str] = None
             content=post.get("content", "No content available"),
             prev_id=prev_id,
             next_id=next_id,
+            is_html=post.get("is_html"),
         )
-        
-        chapter.add_item(css)
+
+        # Reference the shared stylesheet (a link entry, not a new item)
+        chapter.add_link(href="style/main.css", rel="stylesheet", type="text/css")
         book.add_item(chapter)
         chapters.append(chapter)
     
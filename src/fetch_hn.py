@@ -3,8 +3,13 @@ Fetch yesterday's top stories from Hacker News using Algolia API.
 Uses date-based search for stable/fixed content.
 """
 
+import asyncio
 import os
+import orjson
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -13,57 +18,70 @@ ALGOLIA_API = "https://hn.algolia.com/api/v1"
 HN_API_BASE = "https://hacker-news.firebaseio.com/v0"
 DEFAULT_TOP_POSTS_COUNT = 10
 
+# Shared session: keep-alive connections avoid a TCP+TLS handshake per
+# request, which matters most in the per-item fallback loop
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=10,
+    max_retries=Retry(total=2, backoff_factor=0.3),
+))
+
 
 def get_top_posts_count() -> int:
     """Get the number of top posts to fetch from environment or default."""
     return int(os.getenv("TOP_POSTS_COUNT", DEFAULT_TOP_POSTS_COUNT))
 
 
-def get_yesterday_timestamps() -> tuple[int, int]:
+def get_yesterday_timestamps(now: Optional[datetime] = None) -> tuple[int, int]:
     """Get Unix timestamps for yesterday (start and end of day)."""
-    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    if now is None:
+        now = datetime.now()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
     yesterday_start = today - timedelta(days=1)
     yesterday_end = today - timedelta(seconds=1)
     return int(yesterday_start.timestamp()), int(yesterday_end.timestamp())
 
 
-def fetch_yesterday_top_stories(count: int) -> list[dict]:
+def fetch_yesterday_top_stories(count: int, now: Optional[datetime] = None) -> list[dict]:
     """
     Fetch top stories from yesterday using Algolia HN API.
-    
+
     Returns stories sorted by points (score) from yesterday.
     """
-    start_ts, end_ts = get_yesterday_timestamps()
+    start_ts, end_ts = get_yesterday_timestamps(now)
     
     try:
         # Search for stories from yesterday by date range, sorted by points
         # Always fetch a large batch to ensure we have enough after filtering
+        # The score filter runs server-side, and only the fields we use are
+        # returned, keeping the JSON payload small
         params = {
             "tags": "story",
-            "numericFilters": f"created_at_i>={start_ts},created_at_i<={end_ts}",
+            "numericFilters": f"created_at_i>={start_ts},created_at_i<={end_ts},points>=10",
             "hitsPerPage": count * 3,
+            "attributesToRetrieve": "objectID,title,url,author,points,num_comments,created_at_i",
         }
         
         # Use search endpoint (sorted by relevance/points) instead of search_by_date
-        response = requests.get(f"{ALGOLIA_API}/search", params=params, timeout=15)
+        response = _SESSION.get(f"{ALGOLIA_API}/search", params=params, timeout=15)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         
         stories = []
         for hit in data.get("hits", []):
             url = hit.get("url")
-            score = hit.get("points", 0)
-            
-            # Skip stories without external URLs or with low scores
-            if not url or score < 10:
+
+            # Skip stories without external URLs (score filtered server-side)
+            if not url:
                 continue
-                
+
             stories.append({
                 "id": int(hit.get("objectID", 0)),
                 "title": hit.get("title", "Untitled"),
                 "url": url,
                 "author": hit.get("author", "Unknown"),
-                "score": score,
+                "score": hit.get("points", 0),
                 "comment_count": hit.get("num_comments", 0),
                 "time": hit.get("created_at_i", 0),
             })
@@ -76,24 +94,47 @@ def fetch_yesterday_top_stories(count: int) -> list[dict]:
         return []
 
 
-def fetch_top_posts(count: Optional[int] = None) -> list[dict]:
+async def _fetch_item(session: aiohttp.ClientSession, story_id: int) -> Optional[dict]:
+    """Fetch a single HN item asynchronously, returning None on failure."""
+    try:
+        async with session.get(
+            f"{HN_API_BASE}/item/{story_id}.json",
+            timeout=aiohttp.ClientTimeout(total=10),
+        ) as resp:
+            resp.raise_for_status()
+            return await resp.json(loads=orjson.loads)
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return None
+
+
+async def _fetch_items(story_ids: list[int]) -> list[Optional[dict]]:
+    """Fetch all HN items concurrently over a shared session."""
+    async with aiohttp.ClientSession() as session:
+        return await asyncio.gather(*[_fetch_item(session, sid) for sid in story_ids])
+
+
+def fetch_top_posts(count: Optional[int] = None,
+                    now: Optional[datetime] = None) -> list[dict]:
     """
     Fetch the top N stories from yesterday's HN front page.
-    
+
     Args:
         count: Number of posts to fetch. If None, uses TOP_POSTS_COUNT env var or default.
-        
+        now: Reference time for "yesterday". If None, uses the current time.
+
     Returns:
         List of story dictionaries with keys: id, title, url, author, score, comment_count, time
     """
     if count is None:
         count = get_top_posts_count()
-    
-    yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+    if now is None:
+        now = datetime.now()
+
+    yesterday = (now - timedelta(days=1)).strftime("%Y-%m-%d")
     print(f"Fetching HN front page for: {yesterday}")
-    
+
     # Fetch from Algolia API
-    posts = fetch_yesterday_top_stories(count)
+    posts = fetch_yesterday_top_stories(count, now)
     
     if posts:
         for post in posts:
@@ -103,32 +144,29 @@ def fetch_top_posts(count: Optional[int] = None) -> list[dict]:
     # Fallback to live top stories if Algolia fails
     print("Algolia API failed, falling back to live top stories")
     try:
-        response = requests.get(f"{HN_API_BASE}/topstories.json", timeout=10)
+        response = _SESSION.get(f"{HN_API_BASE}/topstories.json", timeout=10)
         response.raise_for_status()
-        story_ids = response.json()[:count * 2]
+        story_ids = orjson.loads(response.content)[:count * 2]
         
+        # Fetch all item details concurrently (one round trip instead of N)
+        items = asyncio.run(_fetch_items(story_ids))
+
         posts = []
-        for story_id in story_ids:
+        for data in items:
             if len(posts) >= count:
                 break
-            try:
-                resp = requests.get(f"{HN_API_BASE}/item/{story_id}.json", timeout=10)
-                resp.raise_for_status()
-                data = resp.json()
-                if data and data.get("url"):
-                    posts.append({
-                        "id": data.get("id"),
-                        "title": data.get("title", "Untitled"),
-                        "url": data.get("url"),
-                        "author": data.get("by", "Unknown"),
-                        "score": data.get("score", 0),
-                        "comment_count": data.get("descendants", 0),
-                        "time": data.get("time", 0),
-                    })
-                    print(f"Fetched: {data['title'][:60]}...")
-            except requests.RequestException:
-                continue
-        
+            if data and data.get("url"):
+                posts.append({
+                    "id": data.get("id"),
+                    "title": data.get("title", "Untitled"),
+                    "url": data.get("url"),
+                    "author": data.get("by", "Unknown"),
+                    "score": data.get("score", 0),
+                    "comment_count": data.get("descendants", 0),
+                    "time": data.get("time", 0),
+                })
+                print(f"Fetched: {data['title'][:60]}...")
+
         return posts
     except requests.RequestException:
         return []
@@ -6,10 +6,14 @@ and sends to configured Kindle email addresses.
 """
 
 import argparse
+import asyncio
 import os
 import sys
 import datetime
 from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
+import aiohttp
 
 # Load environment variables from .env file if present
 try:
@@ -19,11 +23,42 @@ except ImportError:
     pass  # dotenv not required if env vars are set directly
 
 from fetch_hn import fetch_top_posts
-from content_extractor import extract_content
+from content_extractor import fetch_and_extract
 from convert_epub import create_epub
 from send_kindle import send_to_kindle
 
 
+def canonical_url(url: str) -> str:
+    """Normalize a URL for dedupe: lowercase host, no trailing slash, no query."""
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(),
+                       parts.path.rstrip('/'), '', ''))
+
+
+def dedupe_posts(posts: list[dict]) -> list[dict]:
+    """Drop reposts of the same article, keeping the first (highest-ranked)."""
+    seen = set()
+    unique_posts = []
+    for post in posts:
+        key = canonical_url(post["url"])
+        if key in seen:
+            print(f"Skipping duplicate: {post['title'][:50]}...")
+            continue
+        seen.add(key)
+        unique_posts.append(post)
+    return unique_posts
+
+
+async def extract_all_posts(posts: list[dict]) -> list:
+    """Fetch and extract all posts concurrently over a shared HTTP session."""
+    connector = aiohttp.TCPConnector(limit=20)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        return await asyncio.gather(
+            *[fetch_and_extract(session, post["url"]) for post in posts],
+            return_exceptions=True,
+        )
+
+
 def parse_args():
     """Parse command-line arguments."""
     parser = argparse.ArgumentParser(
@@ -57,10 +92,13 @@ def parse_args():
 def main():
     """Main entry point for HN2Kindle."""
     args = parse_args()
-    
+
+    # Read the clock once and reuse it for every date computation this run
+    run_time = datetime.datetime.now()
+
     print("=" * 60)
     print("HN2Kindle - Daily Hacker News Digest")
-    print(f"Date: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Date: {run_time.strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 60)
     
     # Step 1: Fetch top HN posts
@@ -73,33 +111,42 @@ def main():
         post_count = 10
     
     print(f"\n[1/4] Fetching top {post_count} Hacker News posts...")
-    posts = fetch_top_posts(count=post_count)
+    posts = fetch_top_posts(count=post_count, now=run_time)
     
     if not posts:
         print("ERROR: No posts fetched from Hacker News")
         sys.exit(1)
     
     print(f"Successfully fetched {len(posts)} posts")
+
+    # Drop reposts of the same article before spending fetch/extract work
+    posts = dedupe_posts(posts)
     
     # Step 2: Extract content from each post
     print("\n[2/4] Extracting content from articles...")
     enriched_posts = []
-    
-    for i, post in enumerate(posts, 1):
+
+    # Fetch all articles concurrently; network latency dominates, so
+    # overlapping the requests cuts wall time to roughly the slowest fetch
+    results = asyncio.run(extract_all_posts(posts))
+
+    for i, (post, extracted) in enumerate(zip(posts, results), 1):
         print(f"  [{i}/{len(posts)}] {post['title'][:50]}...")
-        
-        extracted = extract_content(post["url"])
-        
-        # Skip posts where content extraction failed
+
+        # Skip posts where fetching or extraction failed
+        if isinstance(extracted, Exception):
+            print(f"    Skipped: {extracted}")
+            continue
         if not extracted.success or not extracted.content.strip():
             print(f"    Skipped: {extracted.error or 'No content'}")
             continue
-        
+
         enriched_posts.append({
             "title": post["title"],  # HN title
             "author": extracted.author or post["author"],
             "url": post["url"],
             "content": extracted.content,
+            "is_html": extracted.is_html,
             "score": post["score"],
             "comment_count": post["comment_count"],
         })
@@ -112,15 +159,15 @@ def main():
     
     # Step 3: Convert to EPUB
     print("\n[3/4] Creating EPUB file...")
-    yesterday = (datetime.datetime.now() - datetime.timedelta(days=1)).strftime("%Y-%m-%d")
-    
+    yesterday = (run_time - datetime.timedelta(days=1)).strftime("%Y-%m-%d")
+
     if args.output:
         epub_path = Path(args.output).absolute()
     else:
         epub_filename = f"HN-{yesterday}.epub"
         epub_path = Path(epub_filename).absolute()
-    
-    create_epub(enriched_posts, str(epub_path))
+
+    create_epub(enriched_posts, str(epub_path), date=run_time.strftime("%Y-%m-%d"))
     print(f"Created: {epub_path}")
     
     # Step 4: Send to Kindle (unless skipped)
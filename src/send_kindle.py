@@ -2,14 +2,27 @@
 Send EPUB files to Kindle via Gmail SMTP.
 """
 
+import base64
 import os
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email.mime.text import MIMEText
-from email import encoders
 from pathlib import Path
 
+# Base64-encoded attachment bodies keyed by (path, mtime) so retries and
+# repeat sends of the same file skip re-encoding
+_B64_CACHE: dict = {}
+
+
+def _encode_epub_base64(epub_file: Path) -> str:
+    """Base64-encode an EPUB file once, caching by path and mtime."""
+    key = (str(epub_file), epub_file.stat().st_mtime)
+    if key not in _B64_CACHE:
+        _B64_CACHE.clear()  # at most one EPUB per run; don't hold stale copies
+        _B64_CACHE[key] = base64.encodebytes(epub_file.read_bytes()).decode("ascii")
+    return _B64_CACHE[key]
+
 
 def get_gmail_credentials() -> tuple[str, str]:
     """Get Gmail credentials from environment variables."""
@@ -60,39 +73,47 @@ def send_to_kindle(epub_path: str, kindle_emails: list[str] = None) -> bool:
         print(f"EPUB file not found: {epub_path}")
         return False
     
-    # Create the email
+    # Create the email (To is set per recipient below)
     msg = MIMEMultipart()
     msg["From"] = gmail_address
-    msg["To"] = ", ".join(kindle_emails)
     msg["Subject"] = f"HN Daily - {epub_file.stem}"
     
     # Add body text
     body = "Your daily Hacker News digest is attached."
     msg.attach(MIMEText(body, "plain"))
     
-    # Attach the EPUB file
-    with open(epub_path, "rb") as f:
-        attachment = MIMEBase("application", "epub+zip")
-        attachment.set_payload(f.read())
-        encoders.encode_base64(attachment)
-        attachment.add_header(
-            "Content-Disposition",
-            f"attachment; filename={epub_file.name}"
-        )
-        msg.attach(attachment)
+    # Attach the EPUB file with a pre-encoded (and cached) base64 payload
+    attachment = MIMEBase("application", "epub+zip")
+    attachment.set_payload(_encode_epub_base64(epub_file))
+    attachment["Content-Transfer-Encoding"] = "base64"
+    attachment.add_header(
+        "Content-Disposition",
+        f"attachment; filename={epub_file.name}"
+    )
+    msg.attach(attachment)
     
-    # Send the email
+    # Send one message per recipient over a single authenticated connection
+    # so one rejected address doesn't fail the whole batch. SMTP_SSL on 465
+    # saves the STARTTLS round trip
+    sent = 0
     try:
-        with smtplib.SMTP("smtp.gmail.com", 587) as server:
-            server.starttls()
+        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
             server.login(gmail_address, gmail_password)
-            server.send_message(msg)
-        return True
-        
-    except smtplib.SMTPException as e:
+            for addr in kindle_emails:
+                del msg["To"]
+                msg["To"] = addr
+                try:
+                    server.send_message(msg, to_addrs=[addr])
+                    sent += 1
+                except smtplib.SMTPException:
+                    print(f"Failed to send to {addr}")
+
+    except smtplib.SMTPException:
         print(f"Failed to send emails")
         return False
 
+    return sent > 0
+
 
 if __name__ == "__main__":
     # Test module (requires proper .env setup)